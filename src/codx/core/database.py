@@ -4,12 +4,46 @@ Database module for codx snippet library.
 Handles database initialization and operations.
 """
 
+import atexit
+import functools
+import json
 import sqlite3
 import os
+from collections import defaultdict
 from pathlib import Path
 from typing import Optional
 
 
+# Maps FTS5 special characters to spaces in a single C-level pass
+_FTS_SCRUB = str.maketrans({char: ' ' for char in '"\'()*:^'})
+
+# Stamped into PRAGMA user_version after schema creation; bump whenever
+# schema.sql changes so existing databases get re-initialized
+CURRENT_SCHEMA_VERSION = 1
+
+# Rows per multi-row INSERT in add_snippets_bulk; 3 bound variables per
+# row keeps this comfortably under SQLite's variable limit
+_BULK_INSERT_CHUNK = 500
+
+
+def _normalize_tags(tags: Optional[list]) -> list:
+    """Normalize caller-supplied tag names once at the API boundary.
+
+    Strips whitespace, lowercases, drops empties, and dedupes, so the
+    write paths work from a clean sorted list instead of re-normalizing
+    (and re-inserting) duplicates per occurrence.
+
+    Args:
+        tags: Raw tag names as passed by the caller, or None
+
+    Returns:
+        Sorted list of unique normalized tag names
+    """
+    if not tags:
+        return []
+    return sorted({t.strip().lower() for t in tags if t and t.strip()})
+
+
 class Database:
     """Database handler for the codx snippet library."""
     
@@ -29,6 +63,9 @@ class Database:
         self.db_path = db_path
         self.connection: Optional[sqlite3.Connection] = None
         self._closed = False
+        # Monotonic counter bumped on every write; lets callers key
+        # caches on (database, version) and invalidate automatically
+        self.db_version = 0
     
     def connect(self) -> sqlite3.Connection:
         """Establish database connection.
@@ -39,10 +76,48 @@ class Database:
         if self._closed:
             raise sqlite3.ProgrammingError("Cannot operate on a closed database.")
         if self.connection is None:
-            self.connection = sqlite3.connect(self.db_path)
+            # Autocommit mode: write methods open explicit BEGIN IMMEDIATE
+            # transactions so each call pays one fsync boundary instead of
+            # the implicit per-statement transactions sqlite3 sets up
+            self.connection = sqlite3.connect(self.db_path, isolation_level=None)
             self.connection.row_factory = sqlite3.Row  # Enable dict-like access
+            # Tune the connection for the read-heavy search workload:
+            # WAL avoids writer/reader blocking, NORMAL sync cuts fsyncs,
+            # and a larger cache plus mmap lets the OS page cache serve
+            # most FTS queries without hitting disk.
+            self.connection.executescript("""
+                PRAGMA journal_mode=WAL;
+                PRAGMA synchronous=NORMAL;
+                PRAGMA temp_store=MEMORY;
+                PRAGMA cache_size=-65536;
+                PRAGMA mmap_size=268435456;
+                PRAGMA foreign_keys=ON;
+            """)
         return self.connection
     
+    @classmethod
+    def _from_connection(cls, connection: sqlite3.Connection, db_path: str = ":memory:") -> "Database":
+        """Wrap an already-open connection in a Database instance.
+
+        Lets callers adopt connections produced elsewhere — notably
+        in-memory clones made with sqlite3's backup API in the test
+        suite. The connection is switched to the autocommit mode and row
+        factory connect() would configure, but the tuning pragmas are
+        not reapplied.
+
+        Args:
+            connection: Open sqlite3 connection to adopt
+            db_path: Path to record on the instance
+
+        Returns:
+            Database instance owning the given connection
+        """
+        db = cls(db_path)
+        connection.isolation_level = None
+        connection.row_factory = sqlite3.Row
+        db.connection = connection
+        return db
+
     def close(self):
         """Close database connection."""
         if self.connection:
@@ -56,73 +131,120 @@ class Database:
         return self.connect()
     
     def initialize_database(self):
-        """Create database tables from schema.sql file."""
+        """Create database tables from schema.sql file.
+
+        Skips the schema file read and DDL parse entirely when the
+        database is already stamped with the current schema version, so
+        callers can invoke this defensively on every startup for free.
+        """
+        conn = self.connect()
+
+        if conn.execute("PRAGMA user_version").fetchone()[0] >= CURRENT_SCHEMA_VERSION:
+            return
+
         schema_path = Path(__file__).parent / "schema.sql"
-        
+
         if not schema_path.exists():
             raise FileNotFoundError(f"Schema file not found: {schema_path}")
-        
+
         with open(schema_path, 'r') as schema_file:
             schema_sql = schema_file.read()
-        
-        conn = self.connect()
-        cursor = conn.cursor()
-        
+
         try:
             # Execute the entire schema as one script to handle multi-line statements
-            cursor.executescript(schema_sql)
-            
+            conn.executescript(schema_sql)
+
+            # Gather statistics so the planner picks the new indexes
+            conn.execute("ANALYZE")
+
+            # Stamp the version so the next call short-circuits above
+            conn.execute(f"PRAGMA user_version = {CURRENT_SCHEMA_VERSION}")
+
             conn.commit()
             print(f"Database initialized successfully at: {os.path.abspath(self.db_path)}")
-            
+
         except sqlite3.Error as e:
             conn.rollback()
             raise Exception(f"Failed to initialize database: {e}")
-        finally:
-            cursor.close()
     
+    def _get_tags_for_snippets(self, snippet_ids: list) -> dict:
+        """Fetch tag names for the given snippet IDs in a single query.
+
+        Args:
+            snippet_ids: List of snippet IDs to look up
+
+        Returns:
+            Mapping of snippet ID to list of tag names
+        """
+        tags_by_id = defaultdict(list)
+        if not snippet_ids:
+            return tags_by_id
+
+        conn = self.connect()
+        placeholders = ','.join('?' * len(snippet_ids))
+        # Aggregate to a JSON array in SQLite so one row comes back per
+        # snippet and decoding is a single C-level json.loads, rather
+        # than appending tag-pair rows one by one in Python
+        rows = conn.execute(f"""
+            SELECT st.snippet_id, json_group_array(t.name)
+            FROM snippet_tags st
+            JOIN tags t ON st.tag_id = t.id
+            WHERE st.snippet_id IN ({placeholders})
+            GROUP BY st.snippet_id
+        """, snippet_ids)
+        for snippet_id, names in rows:
+            tags_by_id[snippet_id] = json.loads(names)
+        return tags_by_id
+
+    def _rows_to_snippets(self, cursor):
+        """Stream snippet dictionaries from a cursor in fetchmany batches.
+
+        The dictionary keys come straight from the SELECT column names via
+        sqlite3.Row, so the row factory does the per-row construction at
+        the C layer and extra columns (rank, search_text) pass through
+        without special handling. Tags are resolved with one batched query
+        per fetch batch, so peak memory stays bounded by the batch size
+        rather than the full result set.
+
+        Args:
+            cursor: Cursor positioned on a snippet query whose columns
+                include at least id, description, and language
+
+        Yields:
+            Dictionaries containing snippet data
+        """
+        while True:
+            batch = cursor.fetchmany(256)
+            if not batch:
+                break
+            tags_by_id = self._get_tags_for_snippets([row[0] for row in batch])
+            for row in batch:
+                snippet = dict(row)
+                snippet['description'] = snippet['description'] or ''
+                snippet['language'] = snippet['language'] or ''
+                snippet['tags'] = tags_by_id.get(snippet['id'], [])
+                yield snippet
+
     def get_all_snippets(self) -> list:
         """Retrieve all snippets with their tags.
-        
+
         Returns:
             List of dictionaries containing snippet data
         """
         conn = self.connect()
-        cursor = conn.cursor()
-        
+
         try:
-            # Get all snippets with their tags
-            cursor.execute("""
-                SELECT s.id, s.description, s.content, s.language, s.created_at, s.updated_at,
-                       GROUP_CONCAT(t.name, ', ') as tags
-                FROM snippets s
-                LEFT JOIN snippet_tags st ON s.id = st.snippet_id
-                LEFT JOIN tags t ON st.tag_id = t.id
-                GROUP BY s.id
-                ORDER BY s.created_at DESC
+            # Fetch snippets and their tags as two flat queries instead of
+            # a three-way join with GROUP BY/GROUP_CONCAT aggregation
+            cursor = conn.execute("""
+                SELECT id, description, content, language, created_at, updated_at
+                FROM snippets
+                ORDER BY created_at DESC
             """)
-            
-            rows = cursor.fetchall()
-            snippets = []
-            
-            for row in rows:
-                snippet = {
-                    'id': row[0],
-                    'description': row[1] or '',
-                    'content': row[2],
-                    'language': row[3] or '',
-                    'created_at': row[4],
-                    'updated_at': row[5],
-                    'tags': row[6].split(', ') if row[6] else []
-                }
-                snippets.append(snippet)
-            
-            return snippets
-            
+            return list(self._rows_to_snippets(cursor))
+
         except sqlite3.Error as e:
             raise Exception(f"Failed to retrieve snippets: {e}")
-        finally:
-            cursor.close()
     
     def get_snippet_by_id(self, snippet_id: int) -> dict:
         """Retrieve a specific snippet by ID.
@@ -134,39 +256,30 @@ class Database:
             Dictionary containing snippet data
         """
         conn = self.connect()
-        cursor = conn.cursor()
-        
+
         try:
-            cursor.execute("""
-                SELECT s.id, s.description, s.content, s.language, s.created_at, s.updated_at,
-                       GROUP_CONCAT(t.name, ', ') as tags
-                FROM snippets s
-                LEFT JOIN snippet_tags st ON s.id = st.snippet_id
-                LEFT JOIN tags t ON st.tag_id = t.id
-                WHERE s.id = ?
-                GROUP BY s.id
-            """, (snippet_id,))
-            
-            row = cursor.fetchone()
+            row = conn.execute("""
+                SELECT id, description, content, language, created_at, updated_at
+                FROM snippets
+                WHERE id = ?
+            """, (snippet_id,)).fetchone()
             if not row:
                 return None
-            
-            snippet = {
-                'id': row[0],
-                'description': row[1] or '',
-                'content': row[2],
-                'language': row[3] or '',
-                'created_at': row[4],
-                'updated_at': row[5],
-                'tags': row[6].split(', ') if row[6] else []
-            }
-            
+
+            snippet = dict(row)
+            snippet['description'] = snippet['description'] or ''
+            snippet['language'] = snippet['language'] or ''
+            snippet['tags'] = json.loads(conn.execute("""
+                SELECT json_group_array(t.name)
+                FROM snippet_tags st
+                JOIN tags t ON st.tag_id = t.id
+                WHERE st.snippet_id = ?
+            """, (snippet_id,)).fetchone()[0])
+
             return snippet
-            
+
         except sqlite3.Error as e:
             raise Exception(f"Failed to retrieve snippet: {e}")
-        finally:
-            cursor.close()
 
     def add_snippet(self, description: str, content: str, language: str = None, tags: list = None) -> int:
         """Add a new snippet to the database.
@@ -181,48 +294,113 @@ class Database:
             ID of the created snippet
         """
         conn = self.connect()
-        cursor = conn.cursor()
-        
+        names = _normalize_tags(tags)
+
         try:
+            conn.execute("BEGIN IMMEDIATE")
+
             # Insert snippet
-            cursor.execute(
+            snippet_id = conn.execute(
                 "INSERT INTO snippets (description, content, language) VALUES (?, ?, ?)",
                 (description, content, language)
-            )
-            snippet_id = cursor.lastrowid
-            
+            ).lastrowid
+
             # Handle tags if provided
-            if tags:
-                for tag_name in tags:
-                    tag_name = tag_name.strip().lower()
-                    if not tag_name:
-                        continue
-                    
-                    # Insert tag if it doesn't exist
-                    cursor.execute(
-                        "INSERT OR IGNORE INTO tags (name) VALUES (?)",
-                        (tag_name,)
-                    )
-                    
-                    # Get tag ID
-                    cursor.execute("SELECT id FROM tags WHERE name = ?", (tag_name,))
-                    tag_id = cursor.fetchone()[0]
-                    
-                    # Link snippet and tag
-                    cursor.execute(
-                        "INSERT OR IGNORE INTO snippet_tags (snippet_id, tag_id) VALUES (?, ?)",
-                        (snippet_id, tag_id)
-                    )
-            
+            if names:
+                # Insert all tags in one batch, fetch their IDs in one
+                # query, then link them to the snippet in one batch
+                conn.executemany(
+                    "INSERT OR IGNORE INTO tags (name) VALUES (?)",
+                    [(name,) for name in names]
+                )
+
+                placeholders = ','.join('?' * len(names))
+                tag_ids = [row[0] for row in conn.execute(
+                    f"SELECT id FROM tags WHERE name IN ({placeholders})",
+                    names
+                )]
+
+                conn.executemany(
+                    "INSERT OR IGNORE INTO snippet_tags (snippet_id, tag_id) VALUES (?, ?)",
+                    [(snippet_id, tag_id) for tag_id in tag_ids]
+                )
+
             conn.commit()
+            self.db_version += 1
             return snippet_id
-            
+
         except sqlite3.Error as e:
             conn.rollback()
             raise Exception(f"Failed to add snippet: {e}")
-        finally:
-            cursor.close()
     
+    def add_snippets_bulk(self, snippets: list) -> list:
+        """Add multiple snippets in a single transaction.
+
+        One executemany covers all snippet rows and two more statements
+        cover every tag and link, so N snippets cost one commit instead
+        of N round-trip transactions through add_snippet.
+
+        Args:
+            snippets: Dictionaries with description and content keys and
+                optionally language and tags
+
+        Returns:
+            List of IDs of the created snippets, in input order
+        """
+        if not snippets:
+            return []
+
+        conn = self.connect()
+
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+
+            # Multi-row VALUES with RETURNING reports the assigned IDs
+            # directly (executemany cannot run RETURNING statements);
+            # chunked so huge batches stay under the variable limit
+            rows = [(s['description'], s['content'], s.get('language')) for s in snippets]
+            snippet_ids = []
+            for start in range(0, len(rows), _BULK_INSERT_CHUNK):
+                chunk = rows[start:start + _BULK_INSERT_CHUNK]
+                values_clause = ','.join(['(?, ?, ?)'] * len(chunk))
+                returned = conn.execute(
+                    "INSERT INTO snippets (description, content, language) "
+                    f"VALUES {values_clause} RETURNING id",
+                    [value for row in chunk for value in row]
+                )
+                # RETURNING order is formally undefined, but the IDs
+                # ascend in insertion order, so sorting restores it
+                snippet_ids.extend(sorted(r[0] for r in returned))
+
+            names_by_snippet = [_normalize_tags(s.get('tags')) for s in snippets]
+            all_names = sorted(set().union(*names_by_snippet))
+            if all_names:
+                conn.executemany(
+                    "INSERT OR IGNORE INTO tags (name) VALUES (?)",
+                    [(name,) for name in all_names]
+                )
+
+                placeholders = ','.join('?' * len(all_names))
+                tag_id_by_name = {row[1]: row[0] for row in conn.execute(
+                    f"SELECT id, name FROM tags WHERE name IN ({placeholders})",
+                    all_names
+                )}
+
+                conn.executemany(
+                    "INSERT OR IGNORE INTO snippet_tags (snippet_id, tag_id) VALUES (?, ?)",
+                    [(snippet_id, tag_id_by_name[name])
+                     for snippet_id, names in zip(snippet_ids, names_by_snippet)
+                     for name in names]
+                )
+
+            conn.commit()
+            self.db_version += 1
+            return snippet_ids
+
+        except sqlite3.Error as e:
+            conn.rollback()
+            raise Exception(f"Failed to add snippets: {e}")
+
     def update_snippet(self, snippet_id: int, description: str, content: str, language: str = None, tags: list = None) -> bool:
         """Update an existing snippet.
         
@@ -230,54 +408,53 @@ class Database:
             True if update was successful, False if snippet not found
         """
         conn = self.connect()
-        cursor = conn.cursor()
-        
+        names = _normalize_tags(tags)
+
         try:
+            conn.execute("BEGIN IMMEDIATE")
+
             # Check if snippet exists first
-            cursor.execute("SELECT id FROM snippets WHERE id = ?", (snippet_id,))
-            if not cursor.fetchone():
+            if not conn.execute("SELECT id FROM snippets WHERE id = ?", (snippet_id,)).fetchone():
+                conn.rollback()
                 return False
-            
+
             # Update snippet
-            cursor.execute(
-                "UPDATE snippets SET description = ?, content = ?, language = ? WHERE id = ?",
+            conn.execute(
+                "UPDATE snippets SET description = ?, content = ?, language = ?, "
+                "updated_at = CURRENT_TIMESTAMP WHERE id = ?",
                 (description, content, language, snippet_id)
             )
-            
+
             # Remove existing tags
-            cursor.execute("DELETE FROM snippet_tags WHERE snippet_id = ?", (snippet_id,))
-            
+            conn.execute("DELETE FROM snippet_tags WHERE snippet_id = ?", (snippet_id,))
+
             # Add new tags
-            if tags:
-                for tag in tags:
-                    tag = tag.strip().lower()
-                    if not tag:
-                        continue
-                    
-                    # Insert tag if it doesn't exist
-                    cursor.execute(
-                        "INSERT OR IGNORE INTO tags (name) VALUES (?)",
-                        (tag,)
-                    )
-                    
-                    # Get tag ID
-                    cursor.execute("SELECT id FROM tags WHERE name = ?", (tag,))
-                    tag_id = cursor.fetchone()[0]
-                    
-                    # Link snippet to tag
-                    cursor.execute(
-                        "INSERT INTO snippet_tags (snippet_id, tag_id) VALUES (?, ?)",
-                        (snippet_id, tag_id)
-                    )
-            
+            if names:
+                # Insert all tags in one batch, fetch their IDs in one
+                # query, then link them to the snippet in one batch
+                conn.executemany(
+                    "INSERT OR IGNORE INTO tags (name) VALUES (?)",
+                    [(name,) for name in names]
+                )
+
+                placeholders = ','.join('?' * len(names))
+                tag_ids = [row[0] for row in conn.execute(
+                    f"SELECT id FROM tags WHERE name IN ({placeholders})",
+                    names
+                )]
+
+                conn.executemany(
+                    "INSERT OR IGNORE INTO snippet_tags (snippet_id, tag_id) VALUES (?, ?)",
+                    [(snippet_id, tag_id) for tag_id in tag_ids]
+                )
+
             conn.commit()
+            self.db_version += 1
             return True
-            
+
         except sqlite3.Error as e:
             conn.rollback()
             raise Exception(f"Failed to update snippet: {e}")
-        finally:
-            cursor.close()
     
     def delete_snippet(self, snippet_id: int) -> bool:
         """Delete a snippet and its associated tags.
@@ -289,29 +466,29 @@ class Database:
             True if snippet was deleted, False if snippet not found
         """
         conn = self.connect()
-        cursor = conn.cursor()
-        
+
         try:
+            conn.execute("BEGIN IMMEDIATE")
+
             # Check if snippet exists
-            cursor.execute("SELECT id FROM snippets WHERE id = ?", (snippet_id,))
-            if not cursor.fetchone():
+            if not conn.execute("SELECT id FROM snippets WHERE id = ?", (snippet_id,)).fetchone():
+                conn.rollback()
                 return False
-            
+
             # Delete snippet-tag associations
-            cursor.execute("DELETE FROM snippet_tags WHERE snippet_id = ?", (snippet_id,))
-            
+            conn.execute("DELETE FROM snippet_tags WHERE snippet_id = ?", (snippet_id,))
+
             # Delete the snippet
-            cursor.execute("DELETE FROM snippets WHERE id = ?", (snippet_id,))
-            
+            conn.execute("DELETE FROM snippets WHERE id = ?", (snippet_id,))
+
             conn.commit()
+            self.db_version += 1
             return True
-            
+
         except sqlite3.Error as e:
             conn.rollback()
             print(f"Failed to delete snippet: {e}")
             return False
-        finally:
-            cursor.close()
     
     def search_snippets_fts(self, query: str, limit: int = 50) -> list:
         """Search snippets using FTS5 full-text search.
@@ -324,52 +501,101 @@ class Database:
             List of dictionaries containing snippet data with search rank
         """
         conn = self.connect()
-        cursor = conn.cursor()
-        
+
         try:
             # Prepare the FTS5 query - escape special characters and add wildcards
             fts_query = self._prepare_fts_query(query)
-            
-            # Search using FTS5 with ranking
-            cursor.execute("""
+
+            # Search using FTS5 with column-weighted bm25 ranking (lower is
+            # better); tags are fetched separately in batched queries
+            # rather than joined and aggregated here
+            cursor = conn.execute("""
                 SELECT s.id, s.description, s.content, s.language, s.created_at, s.updated_at,
-                       GROUP_CONCAT(t.name, ', ') as tags,
-                       fts.rank
+                       s.search_text,
+                       bm25(snippets_fts, 5.0, 1.0, 2.0, 3.0) AS rank
                 FROM snippets_fts fts
-                JOIN snippets s ON fts.content_id = s.id
-                LEFT JOIN snippet_tags st ON s.id = st.snippet_id
-                LEFT JOIN tags t ON st.tag_id = t.id
+                JOIN snippets s ON fts.rowid = s.id
                 WHERE snippets_fts MATCH ?
-                GROUP BY s.id
-                ORDER BY fts.rank
+                ORDER BY rank
                 LIMIT ?
             """, (fts_query, limit))
-            
-            rows = cursor.fetchall()
-            snippets = []
-            
-            for row in rows:
-                snippet = {
-                    'id': row[0],
-                    'description': row[1] or '',
-                    'content': row[2],
-                    'language': row[3] or '',
-                    'created_at': row[4],
-                    'updated_at': row[5],
-                    'tags': row[6].split(', ') if row[6] else [],
-                    'rank': row[7] if len(row) > 7 else 0
-                }
-                snippets.append(snippet)
-            
-            return snippets
+            return list(self._rows_to_snippets(cursor))
             
         except sqlite3.Error as e:
             # Fallback to regular search if FTS5 fails
             print(f"FTS5 search failed, falling back to regular search: {e}")
             return self._fallback_search(query, limit)
-        finally:
-            cursor.close()
     
+    def search_snippet_ids_fts(self, query: str, limit: int = 50) -> list:
+        """Search with FTS5, returning light candidate rows only.
+
+        Each row carries just what the filtering and ranking stages need
+        (id, language, the denormalized tags text, search_text, rank), so
+        candidates that later fall below the relevance threshold never
+        pay for content transfer or tag-list hydration. Pass the
+        surviving IDs to get_snippets_by_ids for the full rows.
+
+        Args:
+            query: Search query string
+            limit: Maximum number of candidates to return
+
+        Returns:
+            List of light dictionaries ordered by search rank
+        """
+        conn = self.connect()
+
+        try:
+            fts_query = self._prepare_fts_query(query)
+
+            cursor = conn.execute("""
+                SELECT s.id, COALESCE(s.language, '') AS language, s.tags,
+                       s.search_text,
+                       bm25(snippets_fts, 5.0, 1.0, 2.0, 3.0) AS rank
+                FROM snippets_fts fts
+                JOIN snippets s ON fts.rowid = s.id
+                WHERE snippets_fts MATCH ?
+                ORDER BY rank
+                LIMIT ?
+            """, (fts_query, limit))
+            return [dict(row) for row in cursor.fetchall()]
+
+        except sqlite3.Error as e:
+            # Fallback to regular search if FTS5 fails; its full rows are
+            # a superset of the light shape
+            print(f"FTS5 search failed, falling back to regular search: {e}")
+            return self._fallback_search(query, limit)
+
+    def get_snippets_by_ids(self, snippet_ids: list) -> list:
+        """Hydrate full snippet dictionaries for the given IDs.
+
+        One batched IN query plus the usual batched tag lookup, instead
+        of one query per snippet. Results come back in the order of
+        snippet_ids; IDs that no longer exist are skipped.
+
+        Args:
+            snippet_ids: Snippet IDs to fetch, in the desired order
+
+        Returns:
+            List of dictionaries containing snippet data
+        """
+        if not snippet_ids:
+            return []
+
+        conn = self.connect()
+
+        try:
+            placeholders = ','.join('?' * len(snippet_ids))
+            cursor = conn.execute(f"""
+                SELECT id, description, content, language, created_at, updated_at
+                FROM snippets
+                WHERE id IN ({placeholders})
+            """, snippet_ids)
+            by_id = {s['id']: s for s in self._rows_to_snippets(cursor)}
+            return [by_id[i] for i in snippet_ids if i in by_id]
+
+        except sqlite3.Error as e:
+            raise Exception(f"Failed to retrieve snippets: {e}")
+
     def _prepare_fts_query(self, query: str) -> str:
         """Prepare a query string for FTS5 search.
         
@@ -380,13 +606,10 @@ class Database:
             FTS5-formatted query string
         """
         # Remove special FTS5 characters that could cause syntax errors
-        special_chars = ['"', "'", '(', ')', '*', ':', '^']
-        cleaned_query = query
-        for char in special_chars:
-            cleaned_query = cleaned_query.replace(char, ' ')
-        
+        cleaned_query = query.translate(_FTS_SCRUB)
+
         # Split into words and add prefix matching
-        words = [word.strip() for word in cleaned_query.split() if word.strip()]
+        words = cleaned_query.split()
         if not words:
             return '""'  # Empty query
         
@@ -411,81 +634,75 @@ class Database:
             List of snippets matching the query
         """
         conn = self.connect()
-        cursor = conn.cursor()
-        
+
         try:
             # Simple LIKE-based search as fallback
             search_pattern = f"%{query}%"
-            cursor.execute("""
-                SELECT s.id, s.description, s.content, s.language, s.created_at, s.updated_at,
-                       GROUP_CONCAT(t.name, ', ') as tags
-                FROM snippets s
-                LEFT JOIN snippet_tags st ON s.id = st.snippet_id
-                LEFT JOIN tags t ON st.tag_id = t.id
-                WHERE s.description LIKE ? OR s.content LIKE ? OR s.language LIKE ?
-                GROUP BY s.id
-                ORDER BY s.created_at DESC
+            cursor = conn.execute("""
+                SELECT id, description, content, language, created_at, updated_at
+                FROM snippets
+                WHERE description LIKE ? OR content LIKE ? OR language LIKE ?
+                ORDER BY created_at DESC
                 LIMIT ?
             """, (search_pattern, search_pattern, search_pattern, limit))
-            
-            rows = cursor.fetchall()
+
             snippets = []
-            
-            for row in rows:
-                snippet = {
-                    'id': row[0],
-                    'description': row[1] or '',
-                    'content': row[2],
-                    'language': row[3] or '',
-                    'created_at': row[4],
-                    'updated_at': row[5],
-                    'tags': row[6].split(', ') if row[6] else [],
-                    'rank': 0  # No ranking for fallback search
-                }
+            for snippet in self._rows_to_snippets(cursor):
+                snippet['rank'] = 0  # No ranking for fallback search
                 snippets.append(snippet)
-            
+
             return snippets
             
         except sqlite3.Error as e:
             raise Exception(f"Fallback search failed: {e}")
-        finally:
-            cursor.close()
     
     def populate_fts_table(self):
-        """Populate the FTS5 table with existing snippet data.
-        
-        This method should be called after adding the FTS5 table to an existing database.
+        """Rebuild the FTS5 index from the snippets table.
+
+        The external-content index is kept in sync incrementally by
+        triggers; this is only needed as a one-time migration or repair.
         """
         conn = self.connect()
-        cursor = conn.cursor()
-        
+
         try:
-            # Clear existing FTS data
-            cursor.execute("DELETE FROM snippets_fts")
-            
-            # Populate FTS table with existing snippets
-            cursor.execute("""
-                INSERT INTO snippets_fts(description, content, language, tags, content_id)
-                SELECT 
-                    s.description,
-                    s.content,
-                    s.language,
-                    COALESCE(GROUP_CONCAT(t.name, ' '), '') as tags,
-                    s.id
-                FROM snippets s
-                LEFT JOIN snippet_tags st ON s.id = st.snippet_id
-                LEFT JOIN tags t ON st.tag_id = t.id
-                GROUP BY s.id
+            conn.execute("BEGIN IMMEDIATE")
+
+            # Refresh the denormalized tag column for all snippets, then
+            # let FTS5 re-read the content table wholesale
+            conn.execute("""
+                UPDATE snippets SET tags = COALESCE(
+                    (SELECT GROUP_CONCAT(t.name, ' ') FROM tags t
+                     JOIN snippet_tags st ON t.id = st.tag_id
+                     WHERE st.snippet_id = snippets.id), '')
             """)
-            
+            conn.execute("INSERT INTO snippets_fts(snippets_fts) VALUES('rebuild')")
+
             conn.commit()
+            self.db_version += 1
             print("FTS5 table populated successfully")
-            
+
         except sqlite3.Error as e:
             conn.rollback()
             raise Exception(f"Failed to populate FTS table: {e}")
-        finally:
-            cursor.close()
+
+
+@functools.lru_cache(maxsize=None)
+def get_db() -> Database:
+    """Return a process-wide shared Database instance.
+
+    SQLite's page cache lives on the connection and is discarded on
+    close, so reopening for every call re-reads warm pages from disk.
+    Keeping one instance alive for the process lifetime lets repeated
+    searches hit the cache.
+    """
+    return Database()
+
+
+@atexit.register
+def _close_shared_db():
+    """Close the shared connection at interpreter shutdown, if one exists."""
+    if get_db.cache_info().currsize:
+        get_db().close()
 
 
 def create_database():
@@ -1,13 +1,23 @@
 -- Database schema for codx snippet library
 
 -- Snippets table
+-- The tags column is a denormalized, space-joined copy of the snippet's
+-- tag names, kept current by the snippet_tags triggers below so the
+-- external-content FTS index can cover tags without extra joins.
+-- search_text materializes the combined text the fuzzy ranker scores,
+-- so it is computed once per write instead of once per query.
 CREATE TABLE snippets (
     id INTEGER PRIMARY KEY AUTOINCREMENT,
     description TEXT,
     content TEXT NOT NULL,
     language TEXT,
+    tags TEXT NOT NULL DEFAULT '',
     created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
-    updated_at DATETIME DEFAULT CURRENT_TIMESTAMP
+    updated_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+    search_text TEXT GENERATED ALWAYS AS (
+        COALESCE(description, '') || ' ' || content || ' ' ||
+        COALESCE(language, '') || ' ' || tags
+    ) STORED
 );
 
 -- Tags table
@@ -25,85 +35,73 @@ CREATE TABLE snippet_tags (
     FOREIGN KEY (tag_id) REFERENCES tags(id) ON DELETE CASCADE
 );
 
--- Create indexes for better performance
+-- Create indexes for better performance; snippet_tags(snippet_id, tag_id)
+-- is already covered by its primary key, and the (tag_id, snippet_id)
+-- index makes the reverse join an index-only scan
 CREATE INDEX idx_snippets_language ON snippets(language);
-CREATE INDEX idx_snippets_created_at ON snippets(created_at);
+CREATE INDEX idx_snippets_created_at ON snippets(created_at DESC);
 CREATE INDEX idx_tags_name ON tags(name);
+CREATE INDEX idx_snippet_tags_tag ON snippet_tags(tag_id, snippet_id);
 
--- FTS5 virtual table for full-text search
+-- FTS5 external-content virtual table: the index reads row data straight
+-- from the snippets table instead of storing a duplicate copy
 CREATE VIRTUAL TABLE snippets_fts USING fts5(
     description,
     content,
     language,
     tags,
-    content_id UNINDEXED
+    content='snippets',
+    content_rowid='id'
 );
 
--- Trigger to update updated_at timestamp
-CREATE TRIGGER update_snippet_timestamp 
-    AFTER UPDATE ON snippets
-    FOR EACH ROW
-    BEGIN
-        UPDATE snippets SET updated_at = CURRENT_TIMESTAMP WHERE id = NEW.id;
-    END;
-
--- Triggers to keep FTS5 table in sync with snippets table
+-- Triggers to keep the external-content FTS5 index in sync with snippets
 CREATE TRIGGER snippets_fts_insert
     AFTER INSERT ON snippets
     FOR EACH ROW
     BEGIN
-        INSERT INTO snippets_fts(description, content, language, tags, content_id)
-        VALUES (
-            NEW.description,
-            NEW.content,
-            NEW.language,
-            (SELECT GROUP_CONCAT(t.name, ' ') FROM tags t 
-             JOIN snippet_tags st ON t.id = st.tag_id 
-             WHERE st.snippet_id = NEW.id),
-            NEW.id
-        );
+        INSERT INTO snippets_fts(rowid, description, content, language, tags)
+        VALUES (NEW.id, NEW.description, NEW.content, NEW.language, NEW.tags);
     END;
 
 CREATE TRIGGER snippets_fts_update
     AFTER UPDATE ON snippets
     FOR EACH ROW
     BEGIN
-        UPDATE snippets_fts SET
-            description = NEW.description,
-            content = NEW.content,
-            language = NEW.language,
-            tags = (SELECT GROUP_CONCAT(t.name, ' ') FROM tags t 
-                   JOIN snippet_tags st ON t.id = st.tag_id 
-                   WHERE st.snippet_id = NEW.id)
-        WHERE content_id = NEW.id;
+        INSERT INTO snippets_fts(snippets_fts, rowid, description, content, language, tags)
+        VALUES ('delete', OLD.id, OLD.description, OLD.content, OLD.language, OLD.tags);
+        INSERT INTO snippets_fts(rowid, description, content, language, tags)
+        VALUES (NEW.id, NEW.description, NEW.content, NEW.language, NEW.tags);
     END;
 
 CREATE TRIGGER snippets_fts_delete
     AFTER DELETE ON snippets
     FOR EACH ROW
     BEGIN
-        DELETE FROM snippets_fts WHERE content_id = OLD.id;
+        INSERT INTO snippets_fts(snippets_fts, rowid, description, content, language, tags)
+        VALUES ('delete', OLD.id, OLD.description, OLD.content, OLD.language, OLD.tags);
     END;
 
--- Trigger to update FTS when tags change
+-- Keep the denormalized snippets.tags column current when tag links
+-- change; the snippets update trigger above propagates the new value
+-- into the FTS index
 CREATE TRIGGER snippet_tags_fts_update
     AFTER INSERT ON snippet_tags
     FOR EACH ROW
     BEGIN
-        UPDATE snippets_fts SET
-            tags = (SELECT GROUP_CONCAT(t.name, ' ') FROM tags t 
-                   JOIN snippet_tags st ON t.id = st.tag_id 
-                   WHERE st.snippet_id = NEW.snippet_id)
-        WHERE content_id = NEW.snippet_id;
+        UPDATE snippets SET
+            tags = COALESCE((SELECT GROUP_CONCAT(t.name, ' ') FROM tags t
+                             JOIN snippet_tags st ON t.id = st.tag_id
+                             WHERE st.snippet_id = NEW.snippet_id), '')
+        WHERE id = NEW.snippet_id;
     END;
 
 CREATE TRIGGER snippet_tags_fts_delete
     AFTER DELETE ON snippet_tags
     FOR EACH ROW
     BEGIN
-        UPDATE snippets_fts SET
-            tags = (SELECT GROUP_CONCAT(t.name, ' ') FROM tags t 
-                   JOIN snippet_tags st ON t.id = st.tag_id 
-                   WHERE st.snippet_id = OLD.snippet_id)
-        WHERE content_id = OLD.snippet_id;
-    END;
\ No newline at end of file
+        UPDATE snippets SET
+            tags = COALESCE((SELECT GROUP_CONCAT(t.name, ' ') FROM tags t
+                             JOIN snippet_tags st ON t.id = st.tag_id
+                             WHERE st.snippet_id = OLD.snippet_id), '')
+        WHERE id = OLD.snippet_id;
+    END;
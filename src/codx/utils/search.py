@@ -1,8 +1,13 @@
 """Search utilities for CODX."""
 
+import copy
+import functools
 from typing import List, Dict, Optional
-from fuzzywuzzy import fuzz, process
-from ..core.database import Database
+from rapidfuzz import fuzz, process
+from ..core.database import Database, get_db
+
+# Cap on how much snippet content feeds the fuzzy scorer per snippet
+_MAX_FUZZY_CONTENT = 4096
 
 
 def search_snippets(query: str, limit: int = 50, language: str = None, tags: List[str] = None, 
@@ -15,40 +20,81 @@ def search_snippets(query: str, limit: int = 50, language: str = None, tags: Lis
         language: Filter by programming language
         tags: Filter by tags (must contain all specified tags)
         use_fuzzy: Whether to apply fuzzy search on top of FTS5 results
-        db: Database instance (will create new one if not provided)
+        db: Database instance (the shared process-wide one is used if not provided)
         
     Returns:
         List of matching snippets sorted by relevance
     """
-    # Initialize database if not provided
+    # Fall back to the shared long-lived connection so repeated searches
+    # reuse SQLite's per-connection page cache instead of reopening
     if db is None:
-        db = Database()
-        should_close = True
-    else:
-        should_close = False
-    
-    try:
-        # If no query, return all snippets with filters
-        if not query.strip():
-            snippets = db.get_all_snippets()
-            return _apply_filters(snippets, language, tags)[:limit]
-        
-        # Use FTS5 search as primary method
-        fts_results = db.search_snippets_fts(query, limit * 2)  # Get more results for filtering
-        
-        # Apply additional filters
-        filtered_results = _apply_filters(fts_results, language, tags)
-        
-        # Apply fuzzy search enhancement if requested
-        if use_fuzzy and filtered_results:
-            enhanced_results = _enhance_with_fuzzy_search(filtered_results, query, limit)
-            return enhanced_results
-        
-        return filtered_results[:limit]
-        
-    finally:
-        if should_close:
-            db.close()
+        db = get_db()
+
+    # If no query, return all snippets with filters
+    if not query.strip():
+        snippets = db.get_all_snippets()
+        return _apply_filters(snippets, language, tags)[:limit]
+
+    # Use FTS5 search as primary method; repeated identical queries are
+    # served from the memoized result (get more results for filtering).
+    # Candidates are light rows — full snippets are hydrated in one
+    # batched query at the end, only for the IDs that survive ranking.
+    fts_results = [copy.copy(s) for s in _cached_fts_search(db, db.db_version, query, limit * 2)]
+
+    # Apply additional filters
+    filtered_results = _apply_filters(fts_results, language, tags)
+
+    # The fuzzy pass exists to catch typos that FTS5 prefix matching
+    # misses; skip it when FTS5 alone clearly suffices
+    if use_fuzzy and filtered_results:
+        # A full page of strong FTS hits needs no re-ranking
+        top_rank = filtered_results[0].get('rank', 0)
+        if len(filtered_results) >= limit and top_rank < -1.0:
+            return _hydrate_results(db, filtered_results[:limit])
+
+        # Queries made only of longer plain-ASCII words are rarely typos
+        if all(len(word) >= 4 and word.isascii() and word.isalnum() for word in query.split()):
+            use_fuzzy = False
+
+    # Apply fuzzy search enhancement if requested
+    if use_fuzzy and filtered_results:
+        enhanced_results = _enhance_with_fuzzy_search(filtered_results, query, limit)
+        return _hydrate_results(db, enhanced_results)
+
+    return _hydrate_results(db, filtered_results[:limit])
+
+
+@functools.lru_cache(maxsize=256)
+def _cached_fts_search(db: Database, db_version: int, query: str, limit: int) -> tuple:
+    """Run a light FTS search and memoize the result for identical queries.
+
+    The database's db_version counter is part of the cache key, so any
+    write to the database naturally invalidates stale entries. Callers
+    must copy the returned snippets before mutating them.
+    """
+    return tuple(db.search_snippet_ids_fts(query, limit))
+
+
+def _hydrate_results(db: Database, results: List[dict]) -> List[dict]:
+    """Swap ranked light candidates for full snippet dictionaries.
+
+    Fetches every surviving snippet in one batched query, preserving the
+    ranked order and carrying the scoring fields over onto the full rows.
+    """
+    if not results:
+        return []
+
+    full_by_id = {s['id']: s for s in db.get_snippets_by_ids([s['id'] for s in results])}
+    hydrated = []
+    for light in results:
+        snippet = full_by_id.get(light['id'])
+        if snippet is None:
+            continue
+        for key in ('rank', '_score', '_fuzzy_score'):
+            if key in light:
+                snippet[key] = light[key]
+        hydrated.append(snippet)
+    return hydrated
 
 
 def fuzzy_search_snippets(snippets: List[dict], query: str, limit: int = 10, 
@@ -85,20 +131,30 @@ def _apply_filters(snippets: List[dict], language: str = None, tags: List[str] =
     Returns:
         Filtered list of snippets
     """
-    filtered_snippets = snippets
-    
-    if language:
-        filtered_snippets = [
-            s for s in filtered_snippets 
-            if s.get('language', '').lower() == language.lower()
-        ]
-    
-    if tags:
-        filtered_snippets = [
-            s for s in filtered_snippets 
-            if all(tag.lower() in [t.lower() for t in s.get('tags', [])] for tag in tags)
-        ]
-    
+    if not language and not tags:
+        return snippets
+
+    # Lower the filter values once and test both conditions in one pass;
+    # tag containment becomes a set-subset check instead of nested loops
+    lang_lower = language.lower() if language else None
+    needed_tags = frozenset(tag.lower() for tag in tags) if tags else None
+
+    filtered_snippets = []
+    for s in snippets:
+        if lang_lower is not None and s.get('language', '').lower() != lang_lower:
+            continue
+        if needed_tags is not None:
+            raw_tags = s.get('tags', ())
+            if isinstance(raw_tags, str):
+                # Light FTS rows carry the denormalized space-joined,
+                # already-lowercase tags text
+                tag_set = s.get('tags_set') or frozenset(raw_tags.split())
+            else:
+                tag_set = s.get('tags_set') or frozenset(t.lower() for t in raw_tags)
+            if not needed_tags.issubset(tag_set):
+                continue
+        filtered_snippets.append(s)
+
     return filtered_snippets
 
 
@@ -115,35 +171,47 @@ def _enhance_with_fuzzy_search(snippets: List[dict], query: str, limit: int) ->
     """
     if not snippets:
         return []
-    
-    # Create searchable text for each snippet
-    searchable_snippets = []
+
+    # Create searchable text for each snippet, keyed for O(1) lookup after
+    # matching; duplicate texts map to a list of their snippets. Snippets
+    # from the database carry a precomputed search_text column; only plain
+    # dicts from other sources pay for the string build here. Content is
+    # truncated since partial_ratio is dominated by short substrings anyway.
+    text_to_snippets = {}
     for snippet in snippets:
-        searchable_text = f"{snippet['description']} {snippet['content']} {snippet['language']} {' '.join(snippet['tags'])}"
-        searchable_snippets.append((searchable_text, snippet))
-    
-    # Perform fuzzy search
+        searchable_text = snippet.get('search_text')
+        if searchable_text is None:
+            searchable_text = f"{snippet['description']} {snippet['content'][:_MAX_FUZZY_CONTENT]} {snippet['language']} {' '.join(snippet['tags'])}"
+        else:
+            searchable_text = searchable_text[:_MAX_FUZZY_CONTENT]
+        text_to_snippets.setdefault(searchable_text, []).append(snippet)
+
+    # Perform fuzzy search; score_cutoff drops sub-threshold matches in
+    # the C layer before they ever reach Python
     matches = process.extract(
         query,
-        [text for text, _ in searchable_snippets],
+        list(text_to_snippets),
         scorer=fuzz.partial_ratio,
-        limit=limit
+        limit=limit,
+        score_cutoff=60
     )
-    
-    # Combine FTS5 rank with fuzzy score
+
+    # Combine FTS5 rank with fuzzy score; the threshold stays strict
+    # (> 60) even though score_cutoff already discarded scores below 60
     result = []
-    for match_text, fuzzy_score in matches:
-        if fuzzy_score > 60:  # Relevance threshold
-            for text, snippet in searchable_snippets:
-                if text == match_text:
-                    # Combine FTS5 rank with fuzzy score for final ranking
-                    fts_rank = snippet.get('rank', 0)
-                    combined_score = (fuzzy_score * 0.7) + (fts_rank * 0.3) if fts_rank else fuzzy_score
-                    snippet['_score'] = combined_score
-                    snippet['_fuzzy_score'] = fuzzy_score
-                    result.append(snippet)
-                    break
-    
+    for match_text, fuzzy_score, _ in matches:
+        if fuzzy_score <= 60:  # Relevance threshold
+            continue
+        for snippet in text_to_snippets[match_text]:
+            # Combine the bm25 score with the fuzzy score for final
+            # ranking; bm25 is negative with lower values ranking better,
+            # so negate it to reward stronger FTS matches
+            fts_rank = snippet.get('rank', 0)
+            combined_score = (fuzzy_score * 0.7) - (fts_rank * 0.3) if fts_rank else fuzzy_score
+            snippet['_score'] = combined_score
+            snippet['_fuzzy_score'] = fuzzy_score
+            result.append(snippet)
+
     # Sort by combined score
     result.sort(key=lambda x: x.get('_score', 0), reverse=True)
     return result
\ No newline at end of file
@@ -1,226 +1,442 @@
 """Shared test fixtures and configuration for codx tests."""
 
 import pytest
-import tempfile
+import re
+import shutil
+import sqlite3
+import sys
 import os
+from contextlib import ExitStack
 from pathlib import Path
-from unittest.mock import patch
+from types import MappingProxyType
+from unittest.mock import MagicMock, patch
 
 from codx.core.database import Database
 
 
+# Seed data shared by the sample-snippet fixtures and the session
+# template databases below
+_SEED_SNIPPETS = [
+    {
+        'description': 'Python Hello World',
+        'content': 'print("Hello, World!")',
+        'language': 'python',
+        'tags': ['python', 'basic']
+    },
+    {
+        'description': 'JavaScript Function',
+        'content': 'function greet(name) { return `Hello, ${name}!`; }',
+        'language': 'javascript',
+        'tags': ['javascript', 'function']
+    },
+    {
+        'description': 'Bash Script',
+        'content': '#!/bin/bash\necho "Hello from bash"',
+        'language': 'bash',
+        'tags': ['bash', 'script']
+    },
+    {
+        'description': 'SQL Query',
+        'content': 'SELECT * FROM users WHERE active = 1;',
+        'language': 'sql',
+        'tags': ['sql', 'database']
+    },
+    {
+        'description': 'CSS Styling',
+        'content': '.container { display: flex; justify-content: center; }',
+        'language': 'css',
+        'tags': ['css', 'styling']
+    }
+]
+
+# Intern the seed vocabulary so every fixture shares one string object
+# per language and tag name instead of allocating fresh copies, and
+# downstream dict and set operations shortcut on identity. The whole
+# structure is then frozen: one immutable tuple of read-only mappings
+# shared by every test, so accidental mutation of shared sample data
+# fails loudly instead of leaking between tests.
+_SEED_SNIPPETS = tuple(
+    MappingProxyType({
+        **snippet,
+        'language': sys.intern(snippet['language']),
+        'tags': tuple(sys.intern(tag) for tag in snippet['tags']),
+    })
+    for snippet in _SEED_SNIPPETS
+)
+
+# The two names that recur across the single-snippet fixtures below
+_PYTHON = sys.intern('python')
+_TEST = sys.intern('test')
+
+# Large snippet body (1000+ lines), built once at import instead of per
+# test requesting the fixture
+_LARGE_CONTENT = "\n".join(map("print('Line {}')".format, range(1001)))
+
+# The single-snippet sample variants, frozen once at import; the named
+# fixtures below and the parametrized snippet_variant fixture all serve
+# entries from this table
+_SNIPPET_VARIANTS = MappingProxyType({
+    'basic': MappingProxyType({
+        'description': 'Test Python snippet',
+        'content': 'print("Hello, World!")',
+        'language': _PYTHON,
+        'tags': (_PYTHON, _TEST, 'hello')
+    }),
+    'variables': MappingProxyType({
+        'description': 'Snippet with variables',
+        'content': 'print("Hello, {{name}}! You are {{age}} years old.")',
+        'language': _PYTHON,
+        'tags': (_PYTHON, 'variables', _TEST)
+    }),
+    'unicode': MappingProxyType({
+        'description': 'Unicode test snippet',
+        'content': 'print("Hello, 世界! 🌍 Здравствуй мир!")',
+        'language': _PYTHON,
+        'tags': (_PYTHON, 'unicode', 'international')
+    }),
+    'special': MappingProxyType({
+        'description': 'Special characters test',
+        'content': 'print(\'Hello, \"World\"!\\n\\tTabbed line\')',
+        'language': _PYTHON,
+        'tags': (_PYTHON, 'special-chars', _TEST)
+    }),
+})
+
+
 @pytest.fixture(scope="session")
-def temp_dir():
-    """Create a temporary directory for test files."""
-    with tempfile.TemporaryDirectory() as tmp_dir:
-        yield tmp_dir
+def temp_dir(tmp_path_factory):
+    """Create a temporary directory for test files.
+
+    Lives under pytest's session temp root, so there is no rmtree walk
+    at session teardown — pytest's own retention policy prunes old runs.
+    """
+    return str(tmp_path_factory.mktemp("codx"))
 
 
 @pytest.fixture
-def temp_db_path():
-    """Create a temporary database file path."""
-    with tempfile.NamedTemporaryFile(suffix='.db', delete=False) as tmp:
-        db_path = tmp.name
-    
-    yield db_path
-    
-    try:
-        os.unlink(db_path)
-    except OSError:
-        pass
+def temp_db_path(tmp_path_factory, request):
+    """Create a temporary database file path.
+
+    Just a path under pytest's session temp directory — no file is
+    opened to reserve the name, and pytest cleans the directory up, so
+    there is no per-test unlink teardown.
+    """
+    return str(tmp_path_factory.mktemp("db") / f"{request.node.name}.db")
+
+
+def _ephemeral_pragmas(db):
+    """Trade durability for speed on a throwaway test database.
+
+    These settings drop fsyncs and journal-file churn entirely, which is
+    safe here because every test database is either in memory already or
+    deleted with pytest's temp directory.
+    """
+    db.conn.executescript(
+        "PRAGMA journal_mode=MEMORY;"
+        "PRAGMA synchronous=OFF;"
+        "PRAGMA temp_store=MEMORY;"
+        "PRAGMA locking_mode=EXCLUSIVE;"
+    )
+    return db
 
 
-@pytest.fixture
-def clean_database(temp_db_path):
-    """Create a clean, initialized database for testing."""
-    db = Database(temp_db_path)
+@pytest.fixture(scope="session")
+def _worker_id(request):
+    """Identify the pytest-xdist worker, or "master" when not parallel.
+
+    Read from the config directly so this works whether or not xdist is
+    installed.
+    """
+    return getattr(request.config, "workerinput", {}).get("workerid", "master")
+
+
+@pytest.fixture(scope="session")
+def _empty_template_db(tmp_path_factory, _worker_id):
+    """Build the initialized-but-empty template database once per session.
+
+    Per-test fixtures copy this file instead of re-running schema
+    initialization for every test. The file is keyed on the xdist
+    worker ID so each parallel worker builds and copies its own
+    template — no shared file, no lock contention — even when
+    --basetemp points every worker at the same directory.
+    """
+    template_path = tmp_path_factory.mktemp("db-templates") / f"empty-{_worker_id}.db"
+    db = _ephemeral_pragmas(Database(str(template_path)))
     db.initialize_database()
+    db.close()
+    return template_path
+
+
+@pytest.fixture(scope="session")
+def _populated_template_db(tmp_path_factory, _worker_id):
+    """Build the seeded template database once per session.
+
+    Returns the template path and the IDs the seed snippets were
+    assigned, so copies can report them without re-inserting. Keyed on
+    the xdist worker ID for the same reason as _empty_template_db.
+    """
+    template_path = tmp_path_factory.mktemp("db-templates") / f"populated-{_worker_id}.db"
+    db = _ephemeral_pragmas(Database(str(template_path)))
+    db.initialize_database()
+    snippet_ids = db.add_snippets_bulk(_SEED_SNIPPETS)
+    db.close()
+    return template_path, snippet_ids
+
+
+@pytest.fixture(scope="session")
+def _empty_template_source(_empty_template_db):
+    """Hold one open connection to the empty template for backups."""
+    source = sqlite3.connect(str(_empty_template_db))
+    yield source
+    source.close()
+
+
+@pytest.fixture(scope="session")
+def _populated_template_source(_populated_template_db):
+    """Hold one open connection to the seeded template for backups."""
+    template_path, snippet_ids = _populated_template_db
+    source = sqlite3.connect(str(template_path))
+    yield source, snippet_ids
+    source.close()
+
+
+def _clone_to_memory(source):
+    """Clone a template database into a fresh in-memory Database.
+
+    sqlite3's backup API copies page-by-page straight into memory, so a
+    test gets a ready schema (and data) without re-running the schema
+    script or touching disk.
+    """
+    dst = sqlite3.connect(":memory:")
+    source.backup(dst)
+    return Database._from_connection(dst)
+
+
+@pytest.fixture
+def clean_database(_empty_template_source):
+    """Create a clean, initialized in-memory database for testing.
+
+    Nothing here needs to survive the test, so the database lives in
+    memory and never touches the block layer. Tests that care about an
+    actual file should use clean_database_on_disk.
+    """
+    db = _clone_to_memory(_empty_template_source)
     yield db
     db.close()
 
 
 @pytest.fixture
+def clean_database_on_disk(temp_db_path, _empty_template_db):
+    """Create a clean, initialized on-disk database for testing."""
+    shutil.copyfile(_empty_template_db, temp_db_path)
+    db = _ephemeral_pragmas(Database(temp_db_path))
+    yield db
+    db.close()
+
+
+@pytest.fixture(scope="session", params=list(_SNIPPET_VARIANTS), ids=list(_SNIPPET_VARIANTS))
+def snippet_variant(request):
+    """Parametrize a test across every single-snippet sample variant.
+
+    Tests that should hold for any snippet content request this one
+    fixture instead of repeating themselves per named variant below.
+    """
+    return _SNIPPET_VARIANTS[request.param]
+
+
+@pytest.fixture(scope="session")
 def sample_snippet_data():
-    """Standard sample snippet data for testing."""
-    return {
-        'description': 'Test Python snippet',
-        'content': 'print("Hello, World!")',
-        'language': 'python',
-        'tags': ['python', 'test', 'hello']
-    }
+    """Standard sample snippet data for testing.
 
+    Session-scoped and read-only: the data is immutable by convention,
+    so one frozen mapping is allocated for the whole run instead of a
+    fresh literal per test.
+    """
+    return _SNIPPET_VARIANTS['basic']
 
-@pytest.fixture
+
+@pytest.fixture(scope="session")
 def multiple_sample_snippets():
     """Multiple sample snippets for testing."""
-    return [
-        {
-            'description': 'Python Hello World',
-            'content': 'print("Hello, World!")',
-            'language': 'python',
-            'tags': ['python', 'basic']
-        },
-        {
-            'description': 'JavaScript Function',
-            'content': 'function greet(name) { return `Hello, ${name}!`; }',
-            'language': 'javascript',
-            'tags': ['javascript', 'function']
-        },
-        {
-            'description': 'Bash Script',
-            'content': '#!/bin/bash\necho "Hello from bash"',
-            'language': 'bash',
-            'tags': ['bash', 'script']
-        },
-        {
-            'description': 'SQL Query',
-            'content': 'SELECT * FROM users WHERE active = 1;',
-            'language': 'sql',
-            'tags': ['sql', 'database']
-        },
-        {
-            'description': 'CSS Styling',
-            'content': '.container { display: flex; justify-content: center; }',
-            'language': 'css',
-            'tags': ['css', 'styling']
-        }
-    ]
+    return _SEED_SNIPPETS
 
 
 @pytest.fixture
-def populated_database(clean_database, multiple_sample_snippets):
+def populated_database(_populated_template_source, multiple_sample_snippets):
     """Database populated with sample snippets."""
-    snippet_ids = []
-    for snippet in multiple_sample_snippets:
-        snippet_id = clean_database.add_snippet(**snippet)
-        snippet_ids.append(snippet_id)
-    
-    return {
-        'database': clean_database,
-        'snippet_ids': snippet_ids,
+    source, snippet_ids = _populated_template_source
+    db = _clone_to_memory(source)
+
+    yield {
+        'database': db,
+        'snippet_ids': list(snippet_ids),
         'snippets': multiple_sample_snippets
     }
 
+    db.close()
+
 
 @pytest.fixture
-def mock_db_path(temp_db_path):
-    """Mock the get_db_path function to return a temporary path."""
+def mock_db_path_cli(temp_db_path):
+    """Mock the CLI's get_db_path to return a temporary path."""
     with patch('codx.cli.commands.get_db_path', return_value=temp_db_path):
-        with patch('codx.tui.app.get_db_path', return_value=temp_db_path):
-            yield temp_db_path
+        yield temp_db_path
+
+
+@pytest.fixture
+def mock_db_path_tui(temp_db_path):
+    """Mock the TUI's get_db_path to return a temporary path.
+
+    Kept separate from the CLI variant because patching codx.tui.app
+    imports Textual and its dependency tree; only request this when the
+    test actually drives the TUI.
+    """
+    with patch('codx.tui.app.get_db_path', return_value=temp_db_path):
+        yield temp_db_path
+
+
+@pytest.fixture
+def mock_db_path(temp_db_path):
+    """Mock get_db_path for both CLI and TUI, for integration tests."""
+    with ExitStack() as stack:
+        stack.enter_context(patch('codx.cli.commands.get_db_path', return_value=temp_db_path))
+        stack.enter_context(patch('codx.tui.app.get_db_path', return_value=temp_db_path))
+        yield temp_db_path
 
 
 @pytest.fixture
-def temp_file_content():
+def temp_file_content(tmp_path_factory):
     """Create a temporary file with content for testing."""
     content = "print('Hello from file')"
-    
-    with tempfile.NamedTemporaryFile(mode='w', suffix='.py', delete=False) as tmp:
-        tmp.write(content)
-        file_path = tmp.name
-    
-    yield file_path, content
-    
-    try:
-        os.unlink(file_path)
-    except OSError:
-        pass
+
+    file_path = tmp_path_factory.mktemp("src") / "snippet.py"
+    file_path.write_text(content)
+
+    return str(file_path), content
+
+
+# The stable mock targets below are patched once per session and only
+# reset between tests, so each requesting test pays a reset_mock call
+# instead of a full patch start/stop cycle.
+
+def _session_patch(request, target, **kwargs):
+    """Start a patch for the whole session and stop it at session end."""
+    patcher = patch(target, **kwargs)
+    mock = patcher.start()
+    request.addfinalizer(patcher.stop)
+    return mock
+
+
+@pytest.fixture(scope="session")
+def _clipboard_mocks(request):
+    # Resolve through codx.cli.commands, which already holds the
+    # pyperclip module, so starting the patch never imports pyperclip
+    # (and whatever clipboard backends it probes) on its own
+    return {
+        'copy': _session_patch(request, 'codx.cli.commands.pyperclip.copy'),
+        'paste': _session_patch(request, 'codx.cli.commands.pyperclip.paste'),
+    }
 
 
 @pytest.fixture
-def mock_clipboard():
+def mock_clipboard(_clipboard_mocks):
     """Mock clipboard operations."""
-    with patch('pyperclip.copy') as mock_copy:
-        with patch('pyperclip.paste', return_value='mocked clipboard content') as mock_paste:
-            yield {
-                'copy': mock_copy,
-                'paste': mock_paste
-            }
+    for mock in _clipboard_mocks.values():
+        mock.reset_mock(return_value=True, side_effect=True)
+    _clipboard_mocks['paste'].return_value = 'mocked clipboard content'
+    return _clipboard_mocks
+
+
+@pytest.fixture(scope="session")
+def _subprocess_mock(request):
+    # Resolved through the execution module that actually calls it, for
+    # the same lazy-import reason as _clipboard_mocks
+    return _session_patch(request, 'codx.utils.execution.subprocess.run')
 
 
 @pytest.fixture
-def mock_subprocess():
+def mock_subprocess(_subprocess_mock):
     """Mock subprocess operations."""
-    with patch('subprocess.run') as mock_run:
-        mock_run.return_value.returncode = 0
-        mock_run.return_value.stdout = "Mock output"
-        mock_run.return_value.stderr = ""
-        yield mock_run
+    _subprocess_mock.reset_mock(return_value=True, side_effect=True)
+    _subprocess_mock.return_value.returncode = 0
+    _subprocess_mock.return_value.stdout = "Mock output"
+    _subprocess_mock.return_value.stderr = ""
+    return _subprocess_mock
+
+
+@pytest.fixture(scope="session")
+def _editor_mock(request):
+    return _session_patch(request, 'codx.utils.helpers.open_editor_for_content')
 
 
 @pytest.fixture
-def mock_editor():
+def mock_editor(_editor_mock):
     """Mock editor operations."""
-    with patch('codx.utils.helpers.open_editor_for_content') as mock_editor:
-        mock_editor.return_value = "print('edited content')"
-        yield mock_editor
+    _editor_mock.reset_mock(return_value=True, side_effect=True)
+    _editor_mock.return_value = "print('edited content')"
+    return _editor_mock
 
 
 @pytest.fixture
-def mock_user_input():
-    """Mock user input for interactive prompts."""
-    with patch('builtins.input') as mock_input:
-        yield mock_input
+def mock_user_input(monkeypatch):
+    """Mock user input for interactive prompts.
+
+    Installed with monkeypatch.setattr — a plain setattr with per-key
+    undo — rather than a full unittest.mock patcher start/stop cycle.
+    """
+    mock_input = MagicMock()
+    monkeypatch.setattr("builtins.input", mock_input)
+    return mock_input
 
 
 @pytest.fixture(autouse=True)
-def reset_environment():
-    """Reset environment variables before each test."""
-    # Store original environment
-    original_env = os.environ.copy()
-    
+def reset_environment(request):
+    """Restore os.environ around tests marked with the env marker.
+
+    Autouse but gated on the marker: unmarked tests — the vast majority
+    — skip straight through with no snapshot at all, while tests that
+    declare they mutate the environment outside monkeypatch's control
+    get a full save and restore.
+    """
+    if request.node.get_closest_marker("env") is None:
+        yield
+        return
+
+    original = dict(os.environ)
+
     yield
-    
-    # Restore original environment
+
     os.environ.clear()
-    os.environ.update(original_env)
+    os.environ.update(original)
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def snippet_with_variables():
     """Sample snippet containing variables for testing."""
-    return {
-        'description': 'Snippet with variables',
-        'content': 'print("Hello, {{name}}! You are {{age}} years old.")',
-        'language': 'python',
-        'tags': ['python', 'variables', 'test']
-    }
+    return _SNIPPET_VARIANTS['variables']
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def large_content_snippet():
     """Sample snippet with large content for testing."""
-    # Generate a large snippet (1000+ lines)
-    large_content = "\n".join([f"print('Line {i}')" for i in range(1001)])
-    
-    return {
+    return MappingProxyType({
         'description': 'Large content snippet',
-        'content': large_content,
-        'language': 'python',
-        'tags': ['python', 'large', 'test']
-    }
+        'content': _LARGE_CONTENT,
+        'language': _PYTHON,
+        'tags': (_PYTHON, 'large', _TEST)
+    })
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def unicode_snippet():
     """Sample snippet with Unicode content for testing."""
-    return {
-        'description': 'Unicode test snippet',
-        'content': 'print("Hello, 世界! 🌍 Здравствуй мир!")',
-        'language': 'python',
-        'tags': ['python', 'unicode', 'international']
-    }
+    return _SNIPPET_VARIANTS['unicode']
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def special_chars_snippet():
     """Sample snippet with special characters for testing."""
-    return {
-        'description': 'Special characters test',
-        'content': 'print(\'Hello, \"World\"!\\n\\tTabbed line\')',
-        'language': 'python',
-        'tags': ['python', 'special-chars', 'test']
-    }
+    return _SNIPPET_VARIANTS['special']
 
 
 # Pytest configuration
@@ -247,26 +463,41 @@ def pytest_configure(config):
     config.addinivalue_line(
         "markers", "utils: marks tests as utility function tests"
     )
+    config.addinivalue_line(
+        "markers", "env: marks tests that mutate os.environ outside monkeypatch"
+    )
+
+
+# Marker assignment tables, precomputed once so the per-item collection
+# loop is a dict lookup plus two compiled-regex searches instead of a
+# chain of substring scans
+_FILE_MARKS = {
+    "test_cli": pytest.mark.cli,
+    "test_tui": pytest.mark.tui,
+    "test_database": pytest.mark.database,
+    "test_utils": pytest.mark.utils,
+}
+_INTEGRATION_RE = re.compile(r"integration|end_to_end|e2e")
+_SLOW_RE = re.compile(r"large|performance|stress")
 
 
 # Custom pytest collection
 def pytest_collection_modifyitems(config, items):
     """Modify test collection to add markers based on file names."""
     for item in items:
-        # Add markers based on test file names
-        if "test_cli" in item.nodeid:
-            item.add_marker(pytest.mark.cli)
-        elif "test_tui" in item.nodeid:
-            item.add_marker(pytest.mark.tui)
-        elif "test_database" in item.nodeid:
-            item.add_marker(pytest.mark.database)
-        elif "test_utils" in item.nodeid:
-            item.add_marker(pytest.mark.utils)
-        
+        # Add markers based on test file names; the basename is already
+        # computed and cached on the item's path object, and markers are
+        # only added when absent so re-running the hook stays idempotent
+        file_mark = _FILE_MARKS.get(item.fspath.basename.split(".", 1)[0])
+        if file_mark is not None and item.get_closest_marker(file_mark.name) is None:
+            item.add_marker(file_mark)
+
+        nodeid = item.nodeid
+
         # Add integration marker for tests that use multiple components
-        if any(keyword in item.nodeid for keyword in ["integration", "end_to_end", "e2e"]):
+        if _INTEGRATION_RE.search(nodeid) and item.get_closest_marker("integration") is None:
             item.add_marker(pytest.mark.integration)
-        
+
         # Add slow marker for tests that might take longer
-        if any(keyword in item.nodeid for keyword in ["large", "performance", "stress"]):
+        if _SLOW_RE.search(nodeid) and item.get_closest_marker("slow") is None:
             item.add_marker(pytest.mark.slow)
\ No newline at end of file